@@ -171,9 +171,9 @@ async def main() -> None:
             system_prompt_path=args.system_prompt_path,
         )
 
-        logger.info(f"Initialized MCP client with provider: {args.provider}")
+        logger.info("Initialized MCP client with provider: %s", args.provider)
         if args.model:
-            logger.info(f"Using model: {args.model}")
+            logger.info("Using model: %s", args.model)
 
         # List servers if requested
         if args.list_servers:
@@ -188,7 +188,7 @@ async def main() -> None:
     except KeyboardInterrupt:
         logger.info("Operation interrupted by user")
     except Exception as e:
-        logger.error(f"Error: {e}")
+        logger.error("Error: %s", e)
         if args.verbose:
             import traceback
 
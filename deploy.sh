@@ -80,6 +80,7 @@ gcloud run deploy ${SERVICE_NAME} \
   --allow-unauthenticated \
   --memory 2Gi \
   --cpu 1 \
+  --no-cpu-throttling \
   --timeout 600 \
   --min-instances 0 \
   --max-instances 1 \
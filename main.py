@@ -28,7 +28,7 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
-        logger.error(f"Error running bot: {e}")
+        logger.error("Error running bot: %s", e)
     finally:
         # Clean up server connections
         if client and client.server_manager:
@@ -38,4 +38,10 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        # Installed alongside Sanic on Linux/macOS; faster socket I/O than asyncio's loop
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
@@ -29,12 +29,11 @@ def load_system_prompt(file_path: Optional[str] = None) -> Optional[str]:
     if not file_path:
         return None
 
-    path = Path(file_path)
-    if not path.exists():
+    try:
+        return Path(file_path).read_text(encoding="utf-8")
+    except FileNotFoundError:
         return None
 
-    return path.read_text(encoding="utf-8")
-
 
 class ClaudeAgent(AgentManger):
     """Anthropic Claude adapter."""
@@ -1,4 +1,5 @@
 import abc
+import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 
@@ -66,6 +67,7 @@ class AgentManger(abc.ABC):
     async def process_query(self, query: str, servers: List[Server]) -> str:
         """Main entry point usable by application code."""
         tools = await self._prepare_tools(servers)
+        tool_index = await self._index_tools(servers)
         messages: List[Message] = []
 
         # Apply system prompt according to the provider's requirements
@@ -86,23 +88,41 @@ class AgentManger(abc.ABC):
                 self.logger.warning("Provider indicated tool_call but none extracted.")
                 break
 
-            for call in calls:
-                server = await self._find_server_for_tool(servers, call["name"])
-                result = await server.call_tool(call["name"], call["args"])
-                self._integrate_tool_result(messages, call, result)
+            # Tool calls from one turn are independent, so run them concurrently.
+            # The task group cancels the remaining calls as soon as one fails.
+            targets = [
+                self._find_server_for_tool(tool_index, call["name"]) for call in calls
+            ]
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [
+                        tg.create_task(server.call_tool(call["name"], call["args"]))
+                        for server, call in zip(targets, calls)
+                    ]
+            except ExceptionGroup as eg:
+                raise eg.exceptions[0]
+            for call, task in zip(calls, tasks):
+                self._integrate_tool_result(messages, call, task.result())
 
             depth += 1
 
         return self._flatten_assistant_text(messages)
 
-    async def _find_server_for_tool(
-        self, servers: List[Server], tool_name: str
-    ) -> Server:
+    async def _index_tools(self, servers: List[Server]) -> Dict[str, Server]:
+        """Map each tool name to the first server that exposes it."""
+        index: Dict[str, Server] = {}
         for s in servers:
-            tools = await s.list_tools()
-            if any(t.name == tool_name for t in tools):
-                return s
-        raise RuntimeError(f"No server exposes tool '{tool_name}'")
+            for t in await s.list_tools():
+                index.setdefault(t.name, s)
+        return index
+
+    def _find_server_for_tool(
+        self, tool_index: Dict[str, Server], tool_name: str
+    ) -> Server:
+        server = tool_index.get(tool_name)
+        if server is None:
+            raise RuntimeError(f"No server exposes tool '{tool_name}'")
+        return server
 
     def _flatten_assistant_text(self, messages: List[Message]) -> str:
         all_texts = []
@@ -51,22 +51,43 @@ class MCPClient:
         response = await self.agent_manager.process_query(query, servers)
         return response
 
+    async def warmup(self):
+        """Fetch every server's tool list ahead of the first query.
+
+        Server tool lists are cached after the first request, so doing it here
+        keeps that round-trip out of the first user-facing response.
+        """
+        servers = self.server_manager.get_servers()
+        await asyncio.gather(*(server.list_tools() for server in servers))
+
+
+_client: Optional[MCPClient] = None
+_client_lock = asyncio.Lock()
+
 
 async def create_client() -> MCPClient:
-    load_dotenv()
-    # Don't use async with here - we need the server_manager to stay active
-    server_manager = ServerConnectionManager(
-        logger=logging.getLogger("ServerConnectionManager"),
-        config_path="config.json",
-    )
-    # Initialize the server manager manually
-    await server_manager.__aenter__()
-
-    client = MCPClient(
-        server_manager=server_manager,
-        logger=logging.getLogger("MCPClient"),
-        provider="gemini",
-        model="gemini-2.5-flash-preview-05-20",
-        system_prompt_path="system.md",
-    )
-    return client
+    """Return the process-wide MCPClient, connecting to the servers on first use.
+
+    Server subprocesses are expensive to spawn, so repeated calls share one
+    client instead of re-running the connection handshake each time.
+    """
+    global _client
+    async with _client_lock:
+        if _client is None:
+            load_dotenv()
+            # Don't use async with here - we need the server_manager to stay active
+            server_manager = ServerConnectionManager(
+                logger=logging.getLogger("ServerConnectionManager"),
+                config_path="config.json",
+            )
+            # Initialize the server manager manually
+            await server_manager.__aenter__()
+
+            _client = MCPClient(
+                server_manager=server_manager,
+                logger=logging.getLogger("MCPClient"),
+                provider="gemini",
+                model="gemini-2.5-flash-preview-05-20",
+                system_prompt_path="system.md",
+            )
+    return _client
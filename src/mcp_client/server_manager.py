@@ -1,17 +1,33 @@
 import asyncio
 import json
 import os
+import re
 import logging
+import random
+from datetime import timedelta
 from typing import Dict, Optional, Any, List
 from contextlib import AsyncExitStack
+from pathlib import Path
 
 from mcp import ClientSession, StdioServerParameters
+from mcp import types
 from mcp.client.stdio import stdio_client
+from mcp.shared.exceptions import McpError
+
+# Matches $VAR and ${VAR} references inside config values; a "$$" run is
+# literal text (e.g. in passwords) and never starts a reference
+_ENV_VAR_RE = re.compile(r"(?<!\$)\$(?:\{([^}]+)\}|([A-Za-z_][A-Za-z0-9_]*))")
+
+# The MCP client reports read timeouts as McpError with HTTP 408. It does not
+# cancel the request on the server, so a timed-out call may still be running.
+_REQUEST_TIMEOUT = 408
 
 
 class Tool:
     """Represents a tool with its properties and formatting."""
 
+    __slots__ = ("name", "description", "input_schema", "parameters")
+
     def __init__(
         self,
         name: str,
@@ -75,7 +91,8 @@ class Server:
         self.logger = logger or logging.getLogger(__name__)
         self.stdio_context: Any | None = None
         self.session: ClientSession | None = None
-        self._cleanup_lock: asyncio.Lock = asyncio.Lock()
+        self._tools: List[Tool] | None = None
+        self._closed: bool = False
         self.exit_stack: AsyncExitStack = AsyncExitStack()
 
     async def __aenter__(self):
@@ -97,14 +114,17 @@ class Server:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean up the server."""
-        async with self._cleanup_lock:
-            try:
-                await self.exit_stack.aclose()
-                self.session = None
-                self.stdio_context = None
-                self.logger.info(f"✨ Cleaned up server {self.name}")
-            except Exception as e:
-                self.logger.error(f"Error during cleanup of server {self.name}: {e}")
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            await self.exit_stack.aclose()
+            self.session = None
+            self.stdio_context = None
+            self._tools = None
+            self.logger.info("✨ Cleaned up server %s", self.name)
+        except Exception as e:
+            self.logger.error("Error during cleanup of server %s: %s", self.name, e)
 
     def _process_env_variables(
         self, env_config: Optional[Dict[str, str]]
@@ -113,7 +133,8 @@ class Server:
 
         This function handles:
         1. Using values from the system environment if env_config is None
-        2. Substituting environment variables in the config values (e.g., $VAR or ${VAR})
+        2. Substituting environment variables in the config values (e.g., $VAR or ${VAR}),
+           including references embedded in longer strings
 
         Args:
             env_config: Environment configuration from config file
@@ -124,26 +145,21 @@ class Server:
         if env_config is None:
             return None
 
+        def substitute(key: str, match: re.Match) -> str:
+            env_var_name = match.group(1) or match.group(2)
+            env_value = os.environ.get(env_var_name)
+            if env_value is None:
+                self.logger.warning(
+                    "Environment variable %s not found for %s", env_var_name, key
+                )
+                return match.group(0)
+            return env_value
+
         processed_env = {}
         for key, value in env_config.items():
             if isinstance(value, str):
-                if value.startswith("$"):
-                    env_var_name = (
-                        value[1:] if not value.startswith("${") else value[2:-1]
-                    )
-                    env_value = os.environ.get(env_var_name)
-                    if env_value is not None:
-                        processed_env[key] = env_value
-                    else:
-                        self.logger.warning(
-                            f"Environment variable {env_var_name} not found for {key}"
-                        )
-                        processed_env[key] = value
-                else:
-                    processed_env[key] = value
-            else:
-                processed_env[key] = value
-
+                value = _ENV_VAR_RE.sub(lambda m: substitute(key, m), value)
+            processed_env[key] = value
         return processed_env
 
     async def _connect_to_stdio_server(
@@ -168,15 +184,23 @@ class Server:
             )
             read, write = stdio_transport
             session = await self.exit_stack.enter_async_context(
-                ClientSession(read, write)
+                ClientSession(read, write, message_handler=self._handle_message)
             )
             await session.initialize()
             self.session = session
         except Exception as e:
-            self.logger.error(f"Error initializing server {self.name}: {e}")
+            self.logger.error("Error initializing server %s: %s", self.name, e)
             # No need to call cleanup here, __aexit__ will handle it
             raise
 
+    async def _handle_message(self, message: Any) -> None:
+        """Drop the cached tool list when the server reports that it changed."""
+        if isinstance(message, types.ServerNotification) and isinstance(
+            message.root, types.ToolListChangedNotification
+        ):
+            self.logger.info("Tool list of server %s changed", self.name)
+            self._tools = None
+
     async def _connect_to_http_server(self, url: str):
         """Connect to an MCP server using HTTP transport
 
@@ -186,17 +210,33 @@ class Server:
         raise NotImplementedError("HTTP transport is not implemented yet")
 
     async def list_tools(self) -> List[Tool]:
-        """List available tools from the server."""
+        """List available tools from the server.
+
+        The tool list is fetched once and cached, since it is requested several
+        times for every query. The cache is cleared when the server sends
+        notifications/tools/list_changed. Callers get their own copy of the list.
+        """
         if not self.session:
             raise RuntimeError(f"Server {self.name} not initialized")
 
-        tools_response = await self.session.list_tools()
-        tools = []
-        for item in tools_response.tools:
-            tools.append(
+        if self._tools is None:
+            tools_response = await self.session.list_tools()
+            self._tools = [
                 Tool(item.name, item.description, item.inputSchema, item.annotations)
-            )
-        return tools
+                for item in tools_response.tools
+            ]
+        return list(self._tools)
+
+    def _is_safe_to_repeat(self, tool_name: str) -> bool:
+        """Whether the tool is annotated as read-only or idempotent."""
+        for tool in self._tools or ():
+            if tool.name == tool_name:
+                hints = tool.parameters
+                return bool(
+                    getattr(hints, "readOnlyHint", False)
+                    or getattr(hints, "idempotentHint", False)
+                )
+        return False
 
     async def call_tool(
         self,
@@ -204,25 +244,52 @@ class Server:
         arguments: Dict[str, Any],
         retries: int = 2,
         delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: Optional[float] = None,
     ):
-        """Call a tool on the server."""
+        """Call a tool on the server.
+
+        Internal server errors are retried with exponential backoff and jitter.
+        Timeouts are only retried for tools annotated as read-only or
+        idempotent, since the timed-out call may still complete on the server.
+        Other errors, such as INVALID_PARAMS or METHOD_NOT_FOUND, are raised
+        immediately.
+
+        Args:
+            tool_name: Name of the tool to call
+            arguments: Arguments to pass to the tool
+            retries: Maximum number of attempts
+            delay: Base delay in seconds before the first retry
+            max_delay: Upper bound in seconds for the backoff delay
+            timeout: Seconds to wait for each attempt, or None to wait forever
+        """
         if not self.session:
             raise RuntimeError(f"Server {self.name} not initialized")
 
+        read_timeout = timedelta(seconds=timeout) if timeout is not None else None
         attempt = 0
         while attempt < retries:
             try:
-                self.logger.info(f"Executing {tool_name}...")
-                result = await self.session.call_tool(tool_name, arguments)
+                self.logger.info("Executing %s...", tool_name)
+                result = await self.session.call_tool(
+                    tool_name, arguments, read_timeout_seconds=read_timeout
+                )
                 return result
-            except Exception as e:
+            except McpError as e:
+                if e.error.code == _REQUEST_TIMEOUT:
+                    if not self._is_safe_to_repeat(tool_name):
+                        raise
+                elif e.error.code != types.INTERNAL_ERROR:
+                    raise
                 attempt += 1
                 self.logger.warning(
-                    f"Error executing tool: {e}. Attempt {attempt} of {retries}."
+                    "Error executing tool: %s. Attempt %d of %d.", e, attempt, retries
                 )
                 if attempt < retries:
-                    self.logger.info(f"Retrying in {delay} seconds...")
-                    await asyncio.sleep(delay)
+                    backoff = delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    backoff = min(max_delay, backoff)
+                    self.logger.info("Retrying in %.2f seconds...", backoff)
+                    await asyncio.sleep(backoff)
                 else:
                     self.logger.error("Max retries reached. Failing.")
                     raise
@@ -240,43 +307,82 @@ class ServerConnectionManager:
         self.logger = logger or logging.getLogger(__name__)
         self.config_path = config_path
         self.server_config: Dict[str, Any] = {}
-        self._server_exit_stack: AsyncExitStack = AsyncExitStack()
+        self._server_tasks: List[asyncio.Task] = []
+        self._shutdown: asyncio.Event = asyncio.Event()
 
     async def __aenter__(self):
         """Initialize by connecting to all servers in the config and command line args"""
         try:
-            with open(self.config_path, "r") as f:
-                config = json.load(f)
-            self.server_config = config
+            # Read off the event loop so startup doesn't stall other coroutines
+            raw_config = await asyncio.to_thread(Path(self.config_path).read_bytes)
+            self.server_config = json.loads(raw_config)
         except Exception as e:
-            self.logger.error(f"Error loading server configuration: {str(e)}")
+            self.logger.error("Error loading server configuration: %s", e)
             raise
 
+        # Connect to all servers concurrently so startup takes as long as the
+        # slowest server rather than the sum of all of them
+        loop = asyncio.get_running_loop()
+        pending = []
         for server_name, server_config in self.server_config.items():
-            server = await self._server_exit_stack.enter_async_context(
-                Server(server_name, server_config, logger=self.logger)
+            server = Server(server_name, server_config, logger=self.logger)
+            ready = loop.create_future()
+            self._server_tasks.append(
+                asyncio.create_task(self._run_server(server, ready))
             )
-            self.servers.append(server)
+            pending.append(ready)
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self.__aexit__(None, None, None)
+            raise errors[0]
+
+        self.servers.extend(results)
 
-        self.logger.info(f"Connected to {len(self.servers)} servers")
+        self.logger.info("Connected to %d servers", len(self.servers))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Clean up all server connections."""
         self.logger.info("🧹 Cleaning up server connections...")
-        await self._server_exit_stack.aclose()
+        self._shutdown.set()
+        await asyncio.gather(*self._server_tasks, return_exceptions=True)
+        self._server_tasks.clear()
         self.logger.info("✨ Server connections cleaned up.")
 
+    async def _run_server(self, server: Server, ready: asyncio.Future) -> None:
+        """Hold a server connection open until the manager shuts down.
+
+        The stdio transport is built on anyio cancel scopes, which must be exited
+        from the same task that entered them, so each server is connected and
+        cleaned up inside its own task.
+
+        Args:
+            server: The server to connect
+            ready: Future resolved with the server once connected, or with the
+                connection error
+        """
+        try:
+            async with server:
+                ready.set_result(server)
+                await self._shutdown.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                self.logger.error("Server %s stopped unexpectedly: %s", server.name, e)
+        finally:
+            if not ready.done():
+                ready.cancel()
+
     def list_connected_servers(self) -> Dict[str, list]:
         """List all connected servers and their available tools
 
         Returns:
             Dictionary with server names as keys and list of tool names as values
         """
-        result = {}
-        for server in self.servers:
-            result[server.name] = []
-        return result
+        return {server.name: [] for server in self.servers}
 
     def get_servers(self) -> List[Server]:
         """Get the servers
@@ -1,15 +1,24 @@
+import asyncio
+import hashlib
+import hmac
 import json
 import os
 import logging
-import traceback
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+import aiohttp
 from slack_bolt.async_app import AsyncApp
 from slack_bolt.adapter.sanic import AsyncSlackRequestHandler
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+from slack_sdk.http_retry.builtin_async_handlers import (
+    AsyncRateLimitErrorRetryHandler,
+)
+from slack_sdk.web.async_client import AsyncWebClient
 from mcp_client.client import MCPClient
 from sanic import Sanic
 from sanic.response import json as sanic_json
 from .markdown_formatter import markdown_to_slack
-import uvicorn
 
 logging.basicConfig(
     level=logging.INFO,
@@ -17,6 +26,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Requests signed longer ago than this are rejected as possible replays
+_SIGNATURE_MAX_AGE = 300
+# "v0=" followed by a hex SHA-256 digest
+_SIGNATURE_LENGTH = 3 + 64
+
+# Posted as soon as a mention arrives and replaced by the answer
+_ACK_TEXT = "⏳ 応答生成中…"
+
+
+def _flatten_thread(messages: List[Dict[str, Any]]) -> str:
+    """Render thread messages as "user: text" lines for the LLM prompt."""
+    return "\n".join(
+        [(msg.get("user") or "") + ": " + (msg.get("text") or "") for msg in messages]
+    )
+
+
+async def _fetch_thread_messages(
+    client: AsyncWebClient, channel: str, thread_ts: str
+) -> List[Dict[str, Any]]:
+    """Fetch every message in a thread, following pagination cursors.
+
+    Slack cursors are opaque and each one is only returned with the previous
+    page, so the pages have to be requested one after another.
+
+    Args:
+        client: Slack web client
+        channel: Channel ID of the thread
+        thread_ts: Timestamp of the thread's parent message
+
+    Returns:
+        All messages in the thread, parent first
+    """
+    messages: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        response = await client.conversations_replies(
+            channel=channel, ts=thread_ts, inclusive=True, limit=200, cursor=cursor
+        )
+        messages.extend(response.get("messages", []))
+        cursor = (response.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return messages
+
 
 class SlackBot:
     def __init__(self, client: MCPClient, config_path=None):
@@ -37,11 +89,25 @@ class SlackBot:
                 "SLACK_BOT_TOKEN, SLACK_APP_TOKEN, and SLACK_SIGNING_SECRET must be set in environment variables"
             )
 
+        # Key for verifying request signatures in the web route
+        self._signing_secret_bytes = self.signing_secret.encode()
+
         # Initialize the Slack app
         self.app = AsyncApp(
             token=self.bot_token,
             signing_secret=self.signing_secret,
         )
+        # Wait out Slack's Retry-After on 429s instead of failing the reply
+        self.app.client.retry_handlers.append(
+            AsyncRateLimitErrorRetryHandler(max_retry_count=2)
+        )
+
+        # Recently handled event_ids, so redelivered events are processed once
+        self._seen_event_order: deque = deque(maxlen=4096)
+        self._seen_event_ids: set = set()
+
+        # Mention handlers running after the HTTP route has returned
+        self._bg_tasks: set = set()
 
         # Register event handlers
         self._register_handlers()
@@ -50,12 +116,164 @@ class SlackBot:
         # Register error handler
         @self.app.error
         async def error_handler(error, body, logger):
-            logger.error(f"Error handling Slack event: {error}")
-            logger.error(f"Event body: {body}")
-            logger.error(traceback.format_exc())
+            logger.error(
+                "Error handling Slack event: %s\nEvent body: %s",
+                error,
+                body,
+                exc_info=error,
+            )
 
         logger.info("SlackBot initialized")
 
+    def _is_duplicate_event(self, event_id: Optional[str]) -> bool:
+        """Record an event_id and report whether it was already handled.
+
+        Args:
+            event_id: The event_id from the Slack event envelope
+
+        Returns:
+            True if the event was seen before and should be skipped
+        """
+        if not event_id:
+            return False
+        if event_id in self._seen_event_ids:
+            return True
+        if len(self._seen_event_order) == self._seen_event_order.maxlen:
+            self._seen_event_ids.discard(self._seen_event_order[0])
+        self._seen_event_order.append(event_id)
+        self._seen_event_ids.add(event_id)
+        return False
+
+    def _verify_signature(self, timestamp: str, body: bytes, signature: str) -> bool:
+        """Check a request's X-Slack-Signature against the signing secret.
+
+        Args:
+            timestamp: The X-Slack-Request-Timestamp header
+            body: The raw request body
+            signature: The X-Slack-Signature header
+
+        Returns:
+            True if the request was signed by Slack recently
+        """
+        # Headers may carry arbitrary bytes; reject anything that cannot be a
+        # valid timestamp or v0 signature before doing any HMAC work
+        if not (timestamp.isascii() and timestamp.isdigit()):
+            return False
+        if abs(time.time() - int(timestamp)) > _SIGNATURE_MAX_AGE:
+            return False
+        if (
+            len(signature) != _SIGNATURE_LENGTH
+            or not signature.isascii()
+            or not signature.startswith("v0=")
+        ):
+            return False
+
+        mac = hmac.new(self._signing_secret_bytes, digestmod=hashlib.sha256)
+        mac.update(b"v0:")
+        mac.update(timestamp.encode())
+        mac.update(b":")
+        mac.update(body)
+        expected = b"v0=" + mac.hexdigest().encode()
+        return hmac.compare_digest(expected, signature.encode())
+
+    async def _handle_mention(self, client: AsyncWebClient, event: Dict[str, Any]):
+        """Answer an app_mention using the whole thread as context.
+
+        Shared by the Socket Mode listener and the HTTP route. A placeholder
+        reply is posted straight away and edited once the answer is ready.
+
+        Args:
+            client: Slack web client used to read the thread and reply
+            event: The app_mention event payload
+        """
+        user = event.get("user")
+        channel = event.get("channel")
+        thread_ts = event.get("thread_ts") or event.get("ts")
+        logger.info("Received mention from user %s in thread %s", user, thread_ts)
+
+        ack, messages = await asyncio.gather(
+            client.chat_postMessage(
+                channel=channel, text=_ACK_TEXT, thread_ts=thread_ts
+            ),
+            _fetch_thread_messages(client, channel, thread_ts),
+            return_exceptions=True,
+        )
+        ack_ts = None
+        if isinstance(ack, Exception):
+            logger.warning("Failed to post acknowledgement: %s", ack)
+        else:
+            ack_ts = ack.get("ts")
+
+        if isinstance(messages, Exception):
+            logger.error("Failed to fetch thread replies", exc_info=messages)
+            await self._post_error(
+                client,
+                channel,
+                thread_ts,
+                ack_ts,
+                "⚠️ スレッドの取得中にエラーが発生しました",
+            )
+            return
+
+        # The placeholder may already be part of the thread; keep it out of the prompt
+        flattened_text = _flatten_thread(
+            [msg for msg in messages if msg.get("ts") != ack_ts]
+        )
+        metadata = {
+            "channel": channel,
+            "thread_ts": thread_ts,
+            "user": user,
+        }
+
+        try:
+            response = await self.client.chat_loop(
+                flattened_text + "\n\n" + json.dumps(metadata)
+            )
+            # Convert markdown to Slack format
+            slack_formatted_response = markdown_to_slack(response)
+            await self._reply(
+                client, channel, thread_ts, ack_ts, slack_formatted_response
+            )
+        except Exception:
+            logger.exception("Failed to generate response")
+            await self._post_error(
+                client,
+                channel,
+                thread_ts,
+                ack_ts,
+                "⚠️ 応答の生成中にエラーが発生しました",
+            )
+
+    async def _reply(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        thread_ts: str,
+        ack_ts: Optional[str],
+        text: str,
+    ):
+        """Post text to the thread, replacing the placeholder reply if there is one."""
+        if ack_ts:
+            await client.chat_update(channel=channel, ts=ack_ts, text=text)
+        else:
+            await client.chat_postMessage(
+                channel=channel, text=text, thread_ts=thread_ts
+            )
+
+    async def _post_error(
+        self,
+        client: AsyncWebClient,
+        channel: str,
+        thread_ts: str,
+        ack_ts: Optional[str],
+        text: str,
+    ):
+        """Tell the thread that something went wrong, without raising."""
+        try:
+            await self._reply(client, channel, thread_ts, ack_ts, text)
+        except Exception as err:
+            logger.error("Failed to send error message: %s", err)
+
     def _register_handlers(self):
         """Register event handlers for the Slack app."""
 
@@ -71,146 +289,87 @@ class SlackBot:
             return {"challenge": event.get("challenge")}
 
         @self.app.event("app_mention")
-        async def handle_app_mention(event, say, client):
+        async def handle_app_mention(event, body, client):
             """
             When the bot is mentioned in a thread, fetch the full thread (including parent message),
             flatten it, and use it as context for processing.
             """
-            user = event.get("user")
-            channel = event.get("channel")
-            thread_ts = event.get("thread_ts") or event.get("ts")
-            logger.info(f"Received mention from user {user} in thread {thread_ts}")
-
-            try:
-                replies_response = await client.conversations_replies(
-                    channel=channel, ts=thread_ts, inclusive=True, limit=100  # 適宜調整
-                )
-                messages = replies_response.get("messages", [])
-                flattened_text = "\n".join(
-                    f"{msg.get('user')}: {msg.get('text')}" for msg in messages
-                )
-                metadata = {
-                    "channel": channel,
-                    "thread_ts": thread_ts,
-                    "user": user,
-                }
-            except Exception as e:
-                logger.error(f"Failed to fetch thread replies: {e}")
-                await say(
-                    text="⚠️ スレッドの取得中にエラーが発生しました", thread_ts=thread_ts
-                )
+            if self._is_duplicate_event(body.get("event_id")):
+                logger.info("Skipping duplicate event %s", body.get("event_id"))
                 return
 
-            try:
-                response = await self.client.chat_loop(
-                    flattened_text + "\n\n" + json.dumps(metadata)
-                )
-                # Convert markdown to Slack format
-                slack_formatted_response = markdown_to_slack(response)
-                await say(text=slack_formatted_response, thread_ts=thread_ts)
-            except Exception as e:
-                logger.error(f"Failed to generate response: {e}")
-                await say(
-                    text="⚠️ 応答の生成中にエラーが発生しました", thread_ts=thread_ts
-                )
+            await self._handle_mention(client, event)
 
     async def start(self):
         """Start the Slack bot using Socket Mode."""
+        try:
+            await self.client.warmup()
+        except Exception as e:
+            logger.warning("MCP warmup failed: %s", e)
+
         if os.environ.get("WEBSOCKET_MODE") == "true":
             logger.info("Starting SlackBot in Socket Mode")
             try:
                 handler = AsyncSocketModeHandler(self.app, self.app_token)
                 # Start the socket mode handler
                 await handler.start_async()
-            except Exception as e:
-                logger.error(f"Error starting SlackBot: {e}")
-                logger.error(traceback.format_exc())
+            except Exception:
+                logger.exception("Error starting SlackBot")
                 raise
         else:
             logger.info("Starting SlackBot in Web Mode")
+            # Share one client and HTTP session across requests so connections
+            # to Slack are kept alive instead of being re-established per event
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+            )
+            self.web_client = AsyncWebClient(token=self.bot_token, session=session)
+            self.web_client.retry_handlers.append(
+                AsyncRateLimitErrorRetryHandler(max_retry_count=2)
+            )
+            try:
+                # Open the connection to Slack before the first event needs it
+                await self.web_client.auth_test()
+            except Exception as e:
+                logger.warning("Slack warmup failed: %s", e)
             try:
                 app = Sanic("SlackBot")
+                # Slack event payloads are small; reject anything far larger
+                app.config.REQUEST_MAX_SIZE = 1_000_000
 
                 @app.route("/slack/events", methods=["POST"])
                 async def slack_events(request):
-                    logger.info(f"Received Slack event: {request.json}")
+                    if not self._verify_signature(
+                        request.headers.get("x-slack-request-timestamp", ""),
+                        request.body,
+                        request.headers.get("x-slack-signature", ""),
+                    ):
+                        logger.warning("Rejected request with invalid Slack signature")
+                        return sanic_json({"ok": False}, status=401)
+
+                    payload = request.json or {}
+                    logger.debug("Received Slack event: %s", payload)
                     # Handle URL verification challenge
-                    if request.json and request.json.get("type") == "url_verification":
+                    if payload.get("type") == "url_verification":
                         logger.info("Received Slack URL verification challenge")
-                        return sanic_json({"challenge": request.json.get("challenge")})
+                        return sanic_json({"challenge": payload.get("challenge")})
 
                     # Handle app_mention events directly
-                    if (
-                        request.json
-                        and request.json.get("event", {}).get("type") == "app_mention"
-                    ):
-                        if request.headers.get("x-slack-retry-num"):
+                    event = payload.get("event") or {}
+                    if event.get("type") == "app_mention":
+                        if request.headers.get(
+                            "x-slack-retry-num"
+                        ) or self._is_duplicate_event(payload.get("event_id")):
                             return sanic_json({"ok": True})
 
                         logger.info("Received app_mention event via HTTP")
-                        event = request.json.get("event", {})
-                        user = event.get("user")
-                        channel = event.get("channel")
-                        thread_ts = event.get("thread_ts") or event.get("ts")
-
-                        try:
-                            # Create a client instance for API calls
-                            from slack_sdk.web.async_client import AsyncWebClient
-
-                            client = AsyncWebClient(token=self.bot_token)
-
-                            # Fetch thread replies
-                            replies_response = await client.conversations_replies(
-                                channel=channel, ts=thread_ts, inclusive=True, limit=100
-                            )
-                            messages = replies_response.get("messages", [])
-                            flattened_text = "\n".join(
-                                f"{msg.get('user')}: {msg.get('text')}"
-                                for msg in messages
-                            )
-                            metadata = {
-                                "channel": channel,
-                                "thread_ts": thread_ts,
-                                "user": user,
-                            }
-
-                            # Generate response
-                            response = await self.client.chat_loop(
-                                flattened_text + "\n\n" + json.dumps(metadata)
-                            )
-
-                            # Convert markdown to Slack format
-                            slack_formatted_response = markdown_to_slack(response)
-
-                            # Send response back to thread
-                            await client.chat_postMessage(
-                                channel=channel,
-                                text=slack_formatted_response,
-                                thread_ts=thread_ts,
-                            )
-
-                            # Return a 200 OK to Slack
-                            return sanic_json({"ok": True})
-
-                        except Exception as e:
-                            logger.error(f"Error handling app_mention via HTTP: {e}")
-                            logger.error(traceback.format_exc())
-
-                            # Try to send error message
-                            try:
-                                from slack_sdk.web.async_client import AsyncWebClient
-
-                                client = AsyncWebClient(token=self.bot_token)
-                                await client.chat_postMessage(
-                                    channel=channel,
-                                    text="⚠️ 応答の生成中にエラーが発生しました",
-                                    thread_ts=thread_ts,
-                                )
-                            except Exception as err:
-                                logger.error(f"Failed to send error message: {err}")
-
-                            # Return a 200 OK to Slack (even on error)
-                            return sanic_json({"ok": True})
+                        # Reply to Slack right away; generating the answer takes
+                        # longer than Slack's 3 second deadline and would cause retries
+                        task = asyncio.create_task(
+                            self._handle_mention(self.web_client, event)
+                        )
+                        self._bg_tasks.add(task)
+                        task.add_done_callback(self._bg_tasks.discard)
 
                     return sanic_json({"ok": True})
 
@@ -222,7 +381,10 @@ class SlackBot:
                 )
                 await server.startup()
                 await server.serve_forever()
-            except Exception as e:
-                logger.error(f"Error creating SlackBot handler: {e}")
-                logger.error(traceback.format_exc())
+            except Exception:
+                logger.exception("Error creating SlackBot handler")
                 raise
+            finally:
+                # Let in-flight replies finish before the session goes away
+                await asyncio.gather(*self._bg_tasks, return_exceptions=True)
+                await session.close()
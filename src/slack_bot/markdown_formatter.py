@@ -1,5 +1,59 @@
 import re
 
+# Fenced code blocks are located first and copied through verbatim
+_CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+# Markup converted in the text between code blocks. Inline code is its own
+# alternative and may also appear inside the other constructs' text, always as
+# a whole unit, so no match can start or end inside it.
+_INLINE_RE = re.compile(
+    r'(?P<inline_code>`[^`]+`)'
+    r'|(?P<header>^#{1,6}[ \t]+(?P<header_text>.+)$)'
+    r'|(?P<bold>\*\*(?P<bold_text>(?:`[^`]+`|[^*`])+)\*\*)'
+    r'|(?P<italic>(?<!\*)\*(?!\*)(?P<italic_text>(?:`[^`]+`|[^*`])+)(?<!\*)\*(?!\*))'
+    r'|(?P<strike>~~(?P<strike_text>(?:`[^`]+`|[^~`])+)~~)'
+    r'|(?P<link>\[(?P<link_text>(?:`[^`]+`|[^\]`])+)\]\((?P<link_url>[^)]+)\))',
+    re.MULTILINE,
+)
+# Every construct above starts with one of these characters
+_MD_CHARS_RE = re.compile(r'[`*~\[#]')
+_CODE_LANG_RE = re.compile(r'```\w*\n')
+
+
+def _convert_token(match: re.Match, in_header: bool = False) -> str:
+    """Return the Slack mrkdwn replacement for a single inline token."""
+    kind = match.lastgroup
+    if kind == 'inline_code' or (kind == 'header' and in_header):
+        return match.group(0)
+    inner = _INLINE_RE.sub(
+        lambda m: _convert_token(m, in_header or kind == 'header'),
+        match.group(kind + '_text'),
+    )
+    if kind == 'header':
+        return '*' + inner + '*'
+    if kind == 'bold':
+        # Headers are already rendered bold, so drop nested bold markers
+        return inner if in_header else '*' + inner + '*'
+    if kind == 'italic':
+        return '_' + inner + '_'
+    if kind == 'strike':
+        return '~' + inner + '~'
+    # kind == 'link'
+    return f"<{match.group('link_url')}|{inner}>"
+
+
+def _convert_inline(text: str, start: int, end: int, parts: list) -> None:
+    """Append the converted form of text[start:end] to parts.
+
+    Matching is bounded to the span but sees the surrounding text, so line
+    anchors and lookbehinds behave as they would on the whole string.
+    """
+    pos = start
+    for match in _INLINE_RE.finditer(text, start, end):
+        parts.append(text[pos:match.start()])
+        parts.append(_convert_token(match))
+        pos = match.end()
+    parts.append(text[pos:end])
+
 
 def markdown_to_slack(text: str) -> str:
     """
@@ -14,56 +68,19 @@ def markdown_to_slack(text: str) -> str:
     - Headers: # text -> *text*
     - Lists: preserved as-is
     """
-    if not text:
+    if not text or not _MD_CHARS_RE.search(text):
         return text
     
-    # Preserve code blocks
-    code_blocks = []
-    def preserve_code_block(match):
-        code_blocks.append(match.group(0))
-        return f"__CODE_BLOCK_{len(code_blocks)-1}__"
-    
-    # Preserve inline code
-    inline_codes = []
-    def preserve_inline_code(match):
-        inline_codes.append(match.group(0))
-        return f"__INLINE_CODE_{len(inline_codes)-1}__"
-    
-    # Store code blocks and inline code
-    text = re.sub(r'```[\s\S]*?```', preserve_code_block, text)
-    text = re.sub(r'`[^`]+`', preserve_inline_code, text)
-    
-    # Convert headers (h1-h6) to bold
-    text = re.sub(r'^#{1,6}\s+(.+)$', r'*\1*', text, flags=re.MULTILINE)
-    
-    # Convert bold syntax: **text** -> *text*
-    text = re.sub(r'\*\*([^*]+)\*\*', r'*\1*', text)
-    
-    # Convert italic syntax: _text_ stays as is, *text* -> _text_
-    # First, temporarily replace _text_ with placeholder
-    text = re.sub(r'_([^_]+)_', r'__ITALIC__\1__ITALIC__', text)
-    # Convert *text* to _text_
-    text = re.sub(r'(?<!\*)\*(?!\*)([^*]+)(?<!\*)\*(?!\*)', r'_\1_', text)
-    # Restore _text_
-    text = text.replace('__ITALIC__', '_')
-    
-    # Convert strikethrough: ~~text~~ -> ~text~
-    text = re.sub(r'~~([^~]+)~~', r'~\1~', text)
-    
-    # Convert links: [text](url) -> <url|text>
-    text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<\2|\1>', text)
-    
-    # Convert blockquotes: > text -> > text (Slack uses same format)
-    # No conversion needed
-    
-    # Restore code blocks (remove language identifier)
-    for i, code_block in enumerate(code_blocks):
+    # Locate code blocks first and only convert markup in the gaps between
+    # them, so no match can reach into a block
+    parts = []
+    pos = 0
+    for block in _CODE_BLOCK_RE.finditer(text):
+        _convert_inline(text, pos, block.start(), parts)
         # Remove language identifier from code blocks
-        cleaned_block = re.sub(r'```\w*\n', '```\n', code_block)
-        text = text.replace(f"__CODE_BLOCK_{i}__", cleaned_block)
-    
-    # Restore inline code
-    for i, inline_code in enumerate(inline_codes):
-        text = text.replace(f"__INLINE_CODE_{i}__", inline_code)
+        parts.append(_CODE_LANG_RE.sub('```\n', block.group(0)))
+        pos = block.end()
+    _convert_inline(text, pos, len(text), parts)
     
-    return text
\ No newline at end of file
+    # Blockquotes (> text) use the same syntax in Slack and need no conversion
+    return ''.join(parts)
@@ -0,0 +1,64 @@
+"""Tests for markdown_to_slack."""
+
+from slack_bot.markdown_formatter import markdown_to_slack
+
+
+def test_plain_text_is_unchanged():
+    assert markdown_to_slack("") == ""
+    assert markdown_to_slack("plain text") == "plain text"
+
+
+def test_bold_becomes_single_asterisks():
+    assert markdown_to_slack("after **b**") == "after *b*"
+
+
+def test_italic_strike_and_link():
+    assert (
+        markdown_to_slack("*it* and _u_ ~~s~~ [label](http://x_y.com)")
+        == "_it_ and _u_ ~s~ <http://x_y.com|label>"
+    )
+
+
+def test_headers_become_bold_without_nested_markers():
+    assert markdown_to_slack("# Head\n## **Sub**") == "*Head*\n*Sub*"
+
+
+def test_header_keeps_inline_code():
+    assert markdown_to_slack("# Use `**x**` now") == "*Use `**x**` now*"
+
+
+def test_emphasis_does_not_reach_into_inline_code():
+    text = "multiply 2 * 3 and `*`"
+    assert markdown_to_slack(text) == text
+
+
+def test_emphasis_does_not_reach_into_code_block():
+    text = "* item one\n```python\ndef f(*args):\n    pass\n```\n* item two"
+    assert markdown_to_slack(text) == (
+        "* item one\n```\ndef f(*args):\n    pass\n```\n* item two"
+    )
+
+
+def test_code_block_keeps_contents_and_drops_language():
+    text = "Pointer *p here\n```c\nint *q;\n```"
+    assert markdown_to_slack(text) == "Pointer *p here\n```\nint *q;\n```"
+
+
+def test_header_syntax_inside_code_block_is_kept():
+    assert markdown_to_slack("```py\n# comment\n```") == "```\n# comment\n```"
+
+
+def test_link_text_keeps_inline_code():
+    assert (
+        markdown_to_slack("[`README.md`](https://x.com/r)")
+        == "<https://x.com/r|`README.md`>"
+    )
+
+
+def test_bold_around_inline_code():
+    assert markdown_to_slack("**`config.json`**") == "*`config.json`*"
+    assert markdown_to_slack("- **Run `npm i`** first") == "- *Run `npm i`* first"
+
+
+def test_strike_around_inline_code():
+    assert markdown_to_slack("~~x `y` z~~") == "~x `y` z~"
@@ -0,0 +1,55 @@
+"""Tests for SlackBot's request signature verification."""
+
+import hashlib
+import hmac
+import time
+from types import SimpleNamespace
+
+from slack_bot import SlackBot
+
+SECRET = b"test-signing-secret"
+BODY = b'{"type":"event_callback","event_id":"Ev1"}'
+
+
+def _sign(timestamp: str, body: bytes = BODY) -> str:
+    base = b"v0:" + timestamp.encode() + b":" + body
+    return "v0=" + hmac.new(SECRET, base, hashlib.sha256).hexdigest()
+
+
+def _verify(timestamp: str, body: bytes, signature: str) -> bool:
+    bot = SimpleNamespace(_signing_secret_bytes=SECRET)
+    return SlackBot._verify_signature(bot, timestamp, body, signature)
+
+
+def test_valid_signature_is_accepted():
+    timestamp = str(int(time.time()))
+    assert _verify(timestamp, BODY, _sign(timestamp))
+
+
+def test_stale_timestamp_is_rejected():
+    timestamp = str(int(time.time()) - 600)
+    assert not _verify(timestamp, BODY, _sign(timestamp))
+
+
+def test_changed_body_is_rejected():
+    timestamp = str(int(time.time()))
+    assert not _verify(timestamp, BODY + b" ", _sign(timestamp))
+
+
+def test_malformed_timestamp_is_rejected():
+    signature = _sign(str(int(time.time())))
+    assert not _verify("", BODY, signature)
+    assert not _verify("12a4", BODY, signature)
+    # Arabic-Indic digits pass int() but are not a Slack timestamp
+    assert not _verify("١٧٠٠٠٠٠٠٠٠", BODY, signature)
+
+
+def test_malformed_signature_is_rejected():
+    timestamp = str(int(time.time()))
+    signature = _sign(timestamp)
+    assert not _verify(timestamp, BODY, signature[:-1])
+    assert not _verify(timestamp, BODY, signature + "0")
+    assert not _verify(timestamp, BODY, "v1=" + signature[3:])
+    # Sanic decodes non-UTF-8 header bytes with surrogateescape
+    assert not _verify(timestamp, BODY, "v0=" + "\udcff" * 64)
+    assert not _verify(timestamp, BODY, "v0=" + "é" * 64)